@@ -116,6 +116,7 @@ class PQMF(torch.nn.Module):
         # keep padding info
         self.pad_fn = torch.nn.ConstantPad1d(taps // 2, 0.0)
 
+    @torch.jit.export
     def analysis(self, x):
         """Analysis with PQMF.
 
@@ -129,6 +130,7 @@ class PQMF(torch.nn.Module):
         x = F.conv1d(self.pad_fn(x), self.analysis_filter)
         return F.conv1d(x, self.updown_filter, stride=self.subbands)
 
+    @torch.jit.export
     def synthesis(self, x):
         """Synthesis with PQMF.
 
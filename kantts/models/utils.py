@@ -1,4 +1,5 @@
 import torch
+from collections import OrderedDict
 from distutils.version import LooseVersion
 
 is_pytorch_17plus = LooseVersion(torch.__version__) >= LooseVersion("1.7")
@@ -21,3 +22,40 @@ def get_mask_from_lengths(lengths, max_len=None):
     mask = ids >= lengths.unsqueeze(1).expand(-1, max_len)
 
     return mask
+
+
+#  LRU of valid-position masks in pinned host memory; bucketed batches
+#  repeat length patterns so most steps hit the cache
+_mask_cache = OrderedDict()
+_mask_cache_size = 256
+
+
+def cached_mask(lengths, max_len, dtype=torch.float32):
+    """Get a valid-position mask from a persistent length-indexed cache.
+
+    Masks are built once per length pattern in pinned host memory and
+    copied to the device with a non-blocking transfer, instead of being
+    recomputed with arange/compare kernels on every step.
+
+    Args:
+        lengths (LongTensor): Valid lengths (B,).
+        max_len (int): Length of the padded axis.
+        dtype (torch.dtype): Dtype of the returned mask.
+
+    Returns:
+        Tensor: Mask with ones at valid positions (B, max_len), on the
+            device of lengths.
+
+    """
+    key = (tuple(lengths.tolist()), max_len, dtype)
+    mask = _mask_cache.get(key)
+    if mask is None:
+        mask = (~get_mask_from_lengths(lengths.cpu(), max_len=max_len)).to(dtype)
+        if torch.cuda.is_available():
+            mask = mask.pin_memory()
+        if len(_mask_cache) >= _mask_cache_size:
+            _mask_cache.popitem(last=False)
+        _mask_cache[key] = mask
+    else:
+        _mask_cache.move_to_end(key)
+    return mask.to(lengths.device, non_blocking=True)
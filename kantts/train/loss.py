@@ -1,7 +1,11 @@
 import torch
 import torch.nn.functional as F
+from distutils.version import LooseVersion
 from kantts.utils.audio_torch import stft, MelSpectrogram
-from kantts.models.utils import get_mask_from_lengths
+from kantts.models.utils import cached_mask
+
+#  the _foreach ops exist since 1.7 but only gained autograd support in 2.0
+is_pytorch_20plus = LooseVersion(torch.__version__) >= LooseVersion("2.0")
 
 
 class MelReconLoss(torch.nn.Module):
@@ -16,20 +20,20 @@ class MelReconLoss(torch.nn.Module):
             raise ValueError("Unknown loss type: {}".format(loss_type))
 
     def forward(self, output_lengths, mel_targets, dec_outputs, postnet_outputs=None):
-        output_masks = get_mask_from_lengths(
-            output_lengths, max_len=mel_targets.size(1)
+        output_masks = cached_mask(
+            output_lengths, mel_targets.size(1), mel_targets.dtype
         )
-        output_masks = ~output_masks
         valid_outputs = output_masks.sum()
 
-        mel_loss_ = torch.sum(
-            self.criterion(mel_targets, dec_outputs) * output_masks.unsqueeze(-1)
+        # einsum folds the mask broadcast into the reduction, avoiding a
+        # masked (B, T, C) temporary the size of the mel spectrogram
+        mel_loss_ = torch.einsum(
+            "btc,bt->", self.criterion(mel_targets, dec_outputs), output_masks
         ) / (valid_outputs * mel_targets.size(-1))
 
         if postnet_outputs is not None:
-            mel_loss = torch.sum(
-                self.criterion(mel_targets, postnet_outputs)
-                * output_masks.unsqueeze(-1)
+            mel_loss = torch.einsum(
+                "btc,bt->", self.criterion(mel_targets, postnet_outputs), output_masks
             ) / (valid_outputs * mel_targets.size(-1))
         else:
             mel_loss = 0.0
@@ -58,33 +62,58 @@ class ProsodyReconLoss(torch.nn.Module):
         pitch_predictions,
         energy_predictions,
     ):
-        input_masks = get_mask_from_lengths(
-            input_lengths, max_len=duration_targets.size(1)
+        input_masks = cached_mask(
+            input_lengths, duration_targets.size(1), torch.bool
         )
-        input_masks = ~input_masks
-        valid_inputs = input_masks.sum()
 
-        dur_loss = (
-            torch.sum(
-                self.criterion(
-                    torch.log(duration_targets.float() + 1), log_duration_predictions
-                )
-                * input_masks
-            )
-            / valid_inputs
-        )
-        pitch_loss = (
-            torch.sum(self.criterion(pitch_targets, pitch_predictions) * input_masks)
-            / valid_inputs
-        )
-        energy_loss = (
-            torch.sum(self.criterion(energy_targets, energy_predictions) * input_masks)
-            / valid_inputs
-        )
+        # boolean indexing gathers only the valid positions, fusing the
+        # mask multiply, sum, and valid-count division into one mean
+        log_duration_targets = torch.log1p(duration_targets.float())
+        dur_loss = self.criterion(log_duration_targets, log_duration_predictions)[
+            input_masks
+        ].mean()
+        pitch_loss = self.criterion(pitch_targets, pitch_predictions)[
+            input_masks
+        ].mean()
+        energy_loss = self.criterion(energy_targets, energy_predictions)[
+            input_masks
+        ].mean()
 
         return dur_loss, pitch_loss, energy_loss
 
 
+def _concat_mean_weights(counts, average, cache, device, dtype):
+    """Get per-element weights for a fused reduction over concatenated outputs.
+
+    Each element of output i is weighted by 1 / (n_i [* #outputs]) so a
+    single dot product matches the sum (or mean) of per-output means.
+
+    Args:
+        counts (list): Element count of each flattened output.
+        average (bool): Whether to average over outputs.
+        cache (dict): Cache of weight vectors keyed by shape signature.
+        device (torch.device): Device of the outputs.
+        dtype (torch.dtype): Dtype of the outputs.
+
+    Returns:
+        Tensor: Per-element weight vector (sum(counts),).
+
+    """
+    key = (tuple(counts), average, device, dtype)
+    weights = cache.get(key)
+    if weights is None:
+        per_output = torch.tensor(
+            [1.0 / n for n in counts], device=device, dtype=dtype
+        )
+        if average:
+            per_output /= len(counts)
+        weights = torch.repeat_interleave(
+            per_output, torch.tensor(counts, device=device)
+        )
+        cache[key] = weights
+    return weights
+
+
 class GeneratorAdversarialLoss(torch.nn.Module):
     """Generator adversarial loss module."""
 
@@ -99,8 +128,11 @@ class GeneratorAdversarialLoss(torch.nn.Module):
         assert loss_type in ["mse", "hinge"], f"{loss_type} is not supported."
         if loss_type == "mse":
             self.criterion = self._mse_loss
+            self.pointwise_criterion = self._mse_pointwise_loss
         else:
             self.criterion = self._hinge_loss
+            self.pointwise_criterion = self._hinge_pointwise_loss
+        self._weight_cache = {}
 
     def forward(self, outputs):
         """Calcualate generator adversarial loss.
@@ -114,22 +146,34 @@ class GeneratorAdversarialLoss(torch.nn.Module):
 
         """
         if isinstance(outputs, (tuple, list)):
-            adv_loss = 0.0
-            for i, outputs_ in enumerate(outputs):
-                adv_loss += self.criterion(outputs_)
-            if self.average_by_discriminators:
-                adv_loss /= i + 1
+            # one fused reduction over all discriminators instead of
+            # one mse_loss (plus ones-tensor allocation) per output
+            flat = torch.cat([outputs_.reshape(-1) for outputs_ in outputs])
+            weights = _concat_mean_weights(
+                [outputs_.numel() for outputs_ in outputs],
+                self.average_by_discriminators,
+                self._weight_cache,
+                flat.device,
+                flat.dtype,
+            )
+            adv_loss = torch.dot(self.pointwise_criterion(flat), weights)
         else:
             adv_loss = self.criterion(outputs)
 
         return adv_loss
 
     def _mse_loss(self, x):
-        return F.mse_loss(x, x.new_ones(x.size()))
+        return self._mse_pointwise_loss(x).mean()
+
+    def _mse_pointwise_loss(self, x):
+        return (x - 1).square()
 
     def _hinge_loss(self, x):
         return -x.mean()
 
+    def _hinge_pointwise_loss(self, x):
+        return -x
+
 
 class DiscriminatorAdversarialLoss(torch.nn.Module):
     """Discriminator adversarial loss module."""
@@ -146,9 +190,14 @@ class DiscriminatorAdversarialLoss(torch.nn.Module):
         if loss_type == "mse":
             self.fake_criterion = self._mse_fake_loss
             self.real_criterion = self._mse_real_loss
+            self.fake_pointwise_criterion = self._mse_fake_pointwise_loss
+            self.real_pointwise_criterion = self._mse_real_pointwise_loss
         else:
             self.fake_criterion = self._hinge_fake_loss
             self.real_criterion = self._hinge_real_loss
+            self.fake_pointwise_criterion = self._hinge_fake_pointwise_loss
+            self.real_pointwise_criterion = self._hinge_real_pointwise_loss
+        self._weight_cache = {}
 
     def forward(self, outputs_hat, outputs):
         """Calcualate discriminator adversarial loss.
@@ -165,18 +214,36 @@ class DiscriminatorAdversarialLoss(torch.nn.Module):
 
         """
         if isinstance(outputs, (tuple, list)):
-            real_loss = 0.0
-            fake_loss = 0.0
-            for i, (outputs_hat_, outputs_) in enumerate(zip(outputs_hat, outputs)):
-                if isinstance(outputs_hat_, (tuple, list)):
-                    # NOTE(kan-bayashi): case including feature maps
-                    outputs_hat_ = outputs_hat_[-1]
-                    outputs_ = outputs_[-1]
-                real_loss += self.real_criterion(outputs_)
-                fake_loss += self.fake_criterion(outputs_hat_)
-            if self.average_by_discriminators:
-                fake_loss /= i + 1
-                real_loss /= i + 1
+            # NOTE(kan-bayashi): case including feature maps
+            outputs_hat = [
+                outputs_hat_[-1] if isinstance(outputs_hat_, (tuple, list)) else outputs_hat_
+                for outputs_hat_ in outputs_hat
+            ]
+            outputs = [
+                outputs_[-1] if isinstance(outputs_, (tuple, list)) else outputs_
+                for outputs_ in outputs
+            ]
+            # one fused reduction per real/fake branch over all discriminators
+            flat = torch.cat([outputs_.reshape(-1) for outputs_ in outputs])
+            flat_hat = torch.cat(
+                [outputs_hat_.reshape(-1) for outputs_hat_ in outputs_hat]
+            )
+            weights = _concat_mean_weights(
+                [outputs_.numel() for outputs_ in outputs],
+                self.average_by_discriminators,
+                self._weight_cache,
+                flat.device,
+                flat.dtype,
+            )
+            weights_hat = _concat_mean_weights(
+                [outputs_hat_.numel() for outputs_hat_ in outputs_hat],
+                self.average_by_discriminators,
+                self._weight_cache,
+                flat_hat.device,
+                flat_hat.dtype,
+            )
+            real_loss = torch.dot(self.real_pointwise_criterion(flat), weights)
+            fake_loss = torch.dot(self.fake_pointwise_criterion(flat_hat), weights_hat)
         else:
             real_loss = self.real_criterion(outputs)
             fake_loss = self.fake_criterion(outputs_hat)
@@ -184,16 +251,28 @@ class DiscriminatorAdversarialLoss(torch.nn.Module):
         return real_loss, fake_loss
 
     def _mse_real_loss(self, x):
-        return F.mse_loss(x, x.new_ones(x.size()))
+        return self._mse_real_pointwise_loss(x).mean()
 
     def _mse_fake_loss(self, x):
-        return F.mse_loss(x, x.new_zeros(x.size()))
+        return self._mse_fake_pointwise_loss(x).mean()
 
     def _hinge_real_loss(self, x):
-        return -torch.mean(torch.min(x - 1, x.new_zeros(x.size())))
+        return self._hinge_real_pointwise_loss(x).mean()
 
     def _hinge_fake_loss(self, x):
-        return -torch.mean(torch.min(-x - 1, x.new_zeros(x.size())))
+        return self._hinge_fake_pointwise_loss(x).mean()
+
+    def _mse_real_pointwise_loss(self, x):
+        return (x - 1).square()
+
+    def _mse_fake_pointwise_loss(self, x):
+        return x.square()
+
+    def _hinge_real_pointwise_loss(self, x):
+        return torch.relu(1 - x)
+
+    def _hinge_fake_pointwise_loss(self, x):
+        return torch.relu(1 + x)
 
 
 class FeatureMatchLoss(torch.nn.Module):
@@ -208,6 +287,37 @@ class FeatureMatchLoss(torch.nn.Module):
         super().__init__()
         self.average_by_layers = average_by_layers
         self.average_by_discriminators = average_by_discriminators
+        # per-element weight vectors keyed by layer-shape signature
+        self._weight_cache = {}
+
+    def _get_weights(self, layer_nums, num_discriminators, device, dtype):
+        """Get the per-layer weight vector replicating the nested-loop math.
+
+        The per-layer L1 mean of layer j in discriminator i is weighted by
+        1 / ([#layers_i] [* #discriminators]) so a single dot product
+        matches the original accumulation with the averaging flags.
+
+        Args:
+            layer_nums (list): Number of layers of each feature map's
+                discriminator.
+            num_discriminators (int): Number of discriminators.
+            device (torch.device): Device of the feature maps.
+            dtype (torch.dtype): Dtype of the feature maps.
+
+        Returns:
+            Tensor: Per-layer weight vector (#feature maps,).
+
+        """
+        key = (tuple(layer_nums), num_discriminators, device, dtype)
+        weights = self._weight_cache.get(key)
+        if weights is None:
+            weights = torch.ones(len(layer_nums), device=device, dtype=dtype)
+            if self.average_by_layers:
+                weights /= torch.tensor(layer_nums, device=device, dtype=dtype)
+            if self.average_by_discriminators:
+                weights /= num_discriminators
+            self._weight_cache[key] = weights
+        return weights
 
     def forward(self, feats_hat, feats):
         """Calcualate feature matching loss.
@@ -222,18 +332,27 @@ class FeatureMatchLoss(torch.nn.Module):
             Tensor: Feature matching loss value.
 
         """
-        feat_match_loss = 0.0
-        for i, (feats_hat_, feats_) in enumerate(zip(feats_hat, feats)):
-            feat_match_loss_ = 0.0
-            for j, (feat_hat_, feat_) in enumerate(zip(feats_hat_, feats_)):
-                feat_match_loss_ += F.l1_loss(feat_hat_, feat_.detach())
-            if self.average_by_layers:
-                feat_match_loss_ /= j + 1
-            feat_match_loss += feat_match_loss_
-        if self.average_by_discriminators:
-            feat_match_loss /= i + 1
+        fh, ft, layer_nums = [], [], []
+        for feats_hat_, feats_ in zip(feats_hat, feats):
+            num_layers = len(feats_hat_)
+            for feat_hat_, feat_ in zip(feats_hat_, feats_):
+                fh.append(feat_hat_)
+                ft.append(feat_.detach())
+                layer_nums.append(num_layers)
+        # multi-tensor ops cover all layers in a few kernel launches
+        # instead of one l1_loss launch per layer; before 2.0 they have
+        # no derivative, so fall back to the per-layer path
+        if is_pytorch_20plus:
+            diffs = torch._foreach_sub(fh, ft)
+            torch._foreach_abs_(diffs)
+        else:
+            diffs = [(feat_hat_ - feat_).abs() for feat_hat_, feat_ in zip(fh, ft)]
+        means = torch.stack([diff.mean() for diff in diffs])
+        weights = self._get_weights(
+            layer_nums, len(feats_hat), means.device, means.dtype
+        )
 
-        return feat_match_loss
+        return torch.dot(means, weights)
 
 
 class MelSpectrogramLoss(torch.nn.Module):
@@ -291,6 +410,14 @@ class MelSpectrogramLoss(torch.nn.Module):
         return mel_loss
 
 
+#  torch.linalg.vector_norm hits a faster flattened-reduction path than
+#  torch.norm(p="fro"); both compute the same Frobenius norm here
+if hasattr(torch.linalg, "vector_norm"):
+    _frobenius_norm = torch.linalg.vector_norm
+else:
+    _frobenius_norm = torch.norm
+
+
 class SpectralConvergenceLoss(torch.nn.Module):
     """Spectral convergence loss module."""
 
@@ -309,7 +436,13 @@ class SpectralConvergenceLoss(torch.nn.Module):
             Tensor: Spectral convergence loss value.
 
         """
-        return torch.norm(y_mag - x_mag, p="fro") / torch.norm(y_mag, p="fro")
+        return _frobenius_norm(y_mag - x_mag) / _frobenius_norm(y_mag)
+
+
+@torch.jit.script
+def _log_l1_loss(x_mag, y_mag):
+    """Fused |log(y) - log(x)| mean computed as |log(y / x)| in one pass."""
+    return y_mag.div(x_mag).log_().abs().mean()
 
 
 class LogSTFTMagnitudeLoss(torch.nn.Module):
@@ -330,7 +463,21 @@ class LogSTFTMagnitudeLoss(torch.nn.Module):
             Tensor: Log STFT magnitude loss value.
 
         """
-        return F.l1_loss(torch.log(y_mag), torch.log(x_mag))
+        return _log_l1_loss(x_mag, y_mag)
+
+
+#  window tensors shared across STFTLoss instances, e.g. the fullband and
+#  subband multi-resolution losses reuse the same window lengths
+_window_cache = {}
+
+
+def _get_window(window, win_length):
+    key = (window, win_length)
+    win = _window_cache.get(key)
+    if win is None:
+        win = getattr(torch, window)(win_length)
+        _window_cache[key] = win
+    return win
 
 
 class STFTLoss(torch.nn.Module):
@@ -347,7 +494,12 @@ class STFTLoss(torch.nn.Module):
         self.spectral_convergence_loss = SpectralConvergenceLoss()
         self.log_stft_magnitude_loss = LogSTFTMagnitudeLoss()
         # NOTE(kan-bayashi): Use register_buffer to fix #223
-        self.register_buffer("window", getattr(torch, window)(win_length))
+        # persistent=False keeps the deterministic window out of
+        # state_dicts and DDP buffer broadcasts; _get_window dedups the
+        # tensor across loss instances
+        self.register_buffer(
+            "window", _get_window(window, win_length), persistent=False
+        )
 
     def forward(self, x, y):
         """Calculate forward propagation.
@@ -393,6 +545,41 @@ class MultiResolutionSTFTLoss(torch.nn.Module):
         self.stft_losses = torch.nn.ModuleList()
         for fs, ss, wl in zip(fft_sizes, hop_sizes, win_lengths):
             self.stft_losses += [STFTLoss(fs, ss, wl, window)]
+        # one stream per resolution, created lazily on the first CUDA forward
+        self.streams = None
+
+    def _multi_resolution_stft(self, xy):
+        """Compute magnitude spectrograms of all resolutions in one pass.
+
+        Args:
+            xy (Tensor): Stacked predicted and groundtruth signals (2 x B, T).
+
+        Returns:
+            list: Magnitude spectrograms, one per resolution.
+
+        """
+        if not xy.is_cuda:
+            return [
+                stft(xy, f.fft_size, f.shift_size, f.win_length, f.window)
+                for f in self.stft_losses
+            ]
+        if self.streams is None:
+            self.streams = [torch.cuda.Stream() for _ in self.stft_losses]
+        mags = []
+        events = []
+        current_stream = torch.cuda.current_stream()
+        for f, stream in zip(self.stft_losses, self.streams):
+            stream.wait_stream(current_stream)
+            with torch.cuda.stream(stream):
+                mags.append(
+                    stft(xy, f.fft_size, f.shift_size, f.win_length, f.window)
+                )
+                event = torch.cuda.Event()
+                event.record(stream)
+                events.append(event)
+        for event in events:
+            current_stream.wait_event(event)
+        return mags
 
     def forward(self, x, y):
         """Calculate forward propagation.
@@ -409,18 +596,56 @@ class MultiResolutionSTFTLoss(torch.nn.Module):
         if len(x.shape) == 3:
             x = x.view(-1, x.size(2))  # (B, C, T) -> (B x C, T)
             y = y.view(-1, y.size(2))  # (B, C, T) -> (B x C, T)
+        # stack prediction and target so each resolution runs a single STFT
+        batch = x.size(0)
+        xy = torch.cat([x, y], dim=0)
         sc_loss = 0.0
         mag_loss = 0.0
-        for f in self.stft_losses:
-            sc_l, mag_l = f(x, y)
-            sc_loss += sc_l
-            mag_loss += mag_l
+        for f, xy_mag in zip(self.stft_losses, self._multi_resolution_stft(xy)):
+            x_mag, y_mag = xy_mag[:batch], xy_mag[batch:]
+            sc_loss += f.spectral_convergence_loss(x_mag, y_mag)
+            mag_loss += f.log_stft_magnitude_loss(x_mag, y_mag)
         sc_loss /= len(self.stft_losses)
         mag_loss /= len(self.stft_losses)
 
         return sc_loss, mag_loss
 
 
+class AutocastLoss(torch.nn.Module):
+    """Run a wrapped loss module under reduced-precision autocast.
+
+    The spectral losses are elementwise/BLAS-light, so letting autocast
+    keep their activations in bf16/fp16 halves the memory traffic of the
+    loss tail while reductions that need FP32 (norms, means) are upcast
+    by autocast automatically.
+    """
+
+    def __init__(self, loss, dtype):
+        """Initialize AutocastLoss module."""
+        super().__init__()
+        self.loss = loss
+        self.dtype = dtype
+
+    def forward(self, *args, **kwargs):
+        if torch.cuda.is_available():
+            with torch.autocast("cuda", dtype=self.dtype):
+                return self.loss(*args, **kwargs)
+        return self.loss(*args, **kwargs)
+
+
+#  losses that are numerically safe to evaluate under autocast
+amp_safe_losses = {"mel_loss", "stft_loss", "subband_stft_loss", "feat_match_loss"}
+
+#  tensor-only loss pipelines worth fusing with torch.compile where
+#  available
+compiled_losses = {"mel_loss", "stft_loss", "subband_stft_loss"}
+
+amp_dtype_dict = {
+    "bf16": torch.bfloat16,
+    "fp16": torch.float16,
+}
+
+
 #  TODO: create a mapping for new loss functions
 loss_dict = {
     "generator_adv_loss": GeneratorAdversarialLoss,
@@ -442,10 +667,26 @@ def criterion_builder(config, device="cpu"):
         criterion (dict): Loss dictionary
     """
     criterion = {}
+    amp_dtype = amp_dtype_dict.get(config.get("precision"))
     for key, value in config["Loss"].items():
         if key in loss_dict:
             if value["enable"]:
                 criterion[key] = loss_dict[key](**value.get("params", {})).to(device)
+                if key in compiled_losses and hasattr(torch, "compile"):
+                    # default mode: the stft losses dispatch on CUDA
+                    # streams, which cudagraph capture (reduce-overhead)
+                    # does not support, and eval/last batches change
+                    # shape, so let dynamo fall back at the graph breaks
+                    # and auto-detect dynamic dims. Compiling forward
+                    # keeps the module itself (and its weights attribute)
+                    # untouched.
+                    criterion[key].forward = torch.compile(criterion[key].forward)
+                if (
+                    amp_dtype is not None
+                    and key in amp_safe_losses
+                    and hasattr(torch, "autocast")
+                ):
+                    criterion[key] = AutocastLoss(criterion[key], amp_dtype)
                 setattr(criterion[key], "weights", value.get("weights", 1.0))
         else:
             raise NotImplementedError("{} is not implemented".format(key))
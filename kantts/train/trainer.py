@@ -3,6 +3,7 @@ import sys
 import logging
 import torch
 from collections import defaultdict
+from contextlib import nullcontext
 from tensorboardX import SummaryWriter
 from tqdm import tqdm
 import soundfile as sf
@@ -379,6 +380,20 @@ class GAN_Trainer(Trainer):
             if idx >= self.config["num_save_intermediate_results"]:
                 break
 
+    def _discriminator_forward(self, y):
+        """Forward the discriminator bank, stream-fused where available.
+
+        Returns:
+            dict: Mapping of discriminator name to its (p, fmap) outputs.
+
+        """
+        if self.model.get("fused_discriminator", None):
+            return self.model["fused_discriminator"](y)
+        return {
+            name: discriminator(y)
+            for name, discriminator in self.model["discriminator"].items()
+        }
+
     @torch.no_grad()
     def eval_step(self, batch):
         y, x = batch
@@ -422,8 +437,7 @@ class GAN_Trainer(Trainer):
         fmap_lst_ = []
         adv_loss = 0.0
         #  adversiral loss
-        for discriminator in self.model["discriminator"].keys():
-            p_, fmap_ = self.model["discriminator"][discriminator](y_)
+        for p_, fmap_ in self._discriminator_forward(y_).values():
             fmap_lst_.append(fmap_)
             adv_loss += (
                 self.criterion["generator_adv_loss"](p_)
@@ -433,13 +447,12 @@ class GAN_Trainer(Trainer):
         gen_loss = aux_loss + adv_loss
 
         if self.criterion.get("feat_match_loss", None):
-            fmap_lst = []
             # no need to track gradients
             #  TODO: implement feature matching loss
-            for discriminator in self.model["discriminator"].keys():
-                with torch.no_grad():
-                    p, fmap = self.model["discriminator"][discriminator](y)
-                    fmap_lst.append(fmap)
+            with torch.no_grad():
+                fmap_lst = [
+                    fmap for p, fmap in self._discriminator_forward(y).values()
+                ]
 
             fm_loss = 0.0
             for fmap_, fmap in zip(fmap_lst, fmap_lst_):
@@ -449,9 +462,11 @@ class GAN_Trainer(Trainer):
             gen_loss += fm_loss * self.criterion["feat_match_loss"].weights
 
         dis_loss = 0.0
-        for discriminator in self.model["discriminator"].keys():
-            p, fmap = self.model["discriminator"][discriminator](y)
-            p_, fmap_ = self.model["discriminator"][discriminator](y_.detach())
+        real_outputs = self._discriminator_forward(y)
+        fake_outputs = self._discriminator_forward(y_.detach())
+        for discriminator in real_outputs.keys():
+            p, fmap = real_outputs[discriminator]
+            p_, fmap_ = fake_outputs[discriminator]
             real_loss, fake_loss = self.criterion["discriminator_adv_loss"](p_, p)
             dis_loss += real_loss + fake_loss
             self.total_eval_loss["eval/real_loss"] += real_loss.item()
@@ -509,8 +524,7 @@ class GAN_Trainer(Trainer):
             if self.steps > self.config["discriminator_train_start_steps"]:
                 adv_loss = 0.0
                 fmap_lst_ = []
-                for discriminator in self.model["discriminator"].keys():
-                    p_, fmap_ = self.model["discriminator"][discriminator](y_)
+                for p_, fmap_ in self._discriminator_forward(y_).values():
                     fmap_lst_.append(fmap_)
                     adv_loss += self.criterion["generator_adv_loss"](p_)
                     self.total_train_loss["train/adversarial_loss"] += adv_loss.item()
@@ -519,13 +533,13 @@ class GAN_Trainer(Trainer):
 
                 # feature matching loss
                 if self.criterion.get("feat_match_loss", None):
-                    fmap_lst = []
                     # no need to track gradients
                     #  TODO: implement feature matching loss
-                    for discriminator in self.model["discriminator"].keys():
-                        with torch.no_grad():
-                            p, fmap = self.model["discriminator"][discriminator](y)
-                            fmap_lst.append(fmap)
+                    with torch.no_grad():
+                        fmap_lst = [
+                            fmap
+                            for p, fmap in self._discriminator_forward(y).values()
+                        ]
 
                     fm_loss = 0.0
                     for fmap_, fmap in zip(fmap_lst, fmap_lst_):
@@ -539,12 +553,17 @@ class GAN_Trainer(Trainer):
             # update generator
             self.optimizer["generator"].zero_grad()
             gen_loss.backward()
-            if self.config["generator_grad_norm"] > 0:
+            # when the optimizer step is fused into DDP backward it has
+            # already consumed the gradients per-bucket, so there is nothing
+            # left to clip and stepping again would double-apply
+            overlapped = getattr(self.optimizer["generator"], "_overlapped", False)
+            if self.config["generator_grad_norm"] > 0 and not overlapped:
                 torch.nn.utils.clip_grad_norm_(
                     self.model["generator"].parameters(),
                     self.config["generator_grad_norm"],
                 )
-            self.optimizer["generator"].step()
+            if not overlapped:
+                self.optimizer["generator"].step()
             self.scheduler["generator"].step()
 
         # update discriminator
@@ -558,9 +577,11 @@ class GAN_Trainer(Trainer):
 
             # discriminator loss
             dis_loss = 0.0
-            for discriminator in self.model["discriminator"].keys():
-                p, fmap = self.model["discriminator"][discriminator](y)
-                p_, fmap_ = self.model["discriminator"][discriminator](y_.detach())
+            real_outputs = self._discriminator_forward(y)
+            fake_outputs = self._discriminator_forward(y_.detach())
+            for discriminator in real_outputs.keys():
+                p, fmap = real_outputs[discriminator]
+                p_, fmap_ = fake_outputs[discriminator]
                 real_loss, fake_loss = self.criterion["discriminator_adv_loss"](p_, p)
                 dis_loss += real_loss + fake_loss
                 self.total_train_loss["train/real_loss"] += real_loss.item()
@@ -584,6 +605,11 @@ class GAN_Trainer(Trainer):
                 self.scheduler["discriminator"][key].step()
 
     def save_checkpoint(self, checkpoint_path):
+        if getattr(self.optimizer["generator"], "_overlapped", False):
+            logging.warning(
+                "Generator optimizer is fused into DDP backward; the saved"
+                " generator optimizer state is the unstepped eager copy."
+            )
         state_dict = {
             "optimizer": {
                 "generator": self.optimizer["generator"].state_dict(),
@@ -888,15 +914,26 @@ class Sambert_Trainer(Trainer):
             energy_predictions,
         )
         loss_total = mel_loss_ + mel_loss + dur_loss + pitch_loss + energy_loss
-        self.optimizer["KanTtsSAMBERT"].zero_grad()
-        loss_total.backward()
 
-        if self.grad_clip is not None:
-            torch.nn.utils.clip_grad_norm_(
-                self.model["KanTtsSAMBERT"].parameters(), self.grad_clip
-            )
-        self.optimizer["KanTtsSAMBERT"].step()
-        self.scheduler["KanTtsSAMBERT"].step()
+        accum_steps = self.config.get("accum_steps", 1)
+        update_step = accum_steps <= 1 or self.steps % accum_steps == 0
+        # skip gradient allreduce on accumulation micro-steps; DDP syncs
+        # once on the final backward of each accumulation window
+        if self.distributed and not update_step:
+            sync_context = self.model["KanTtsSAMBERT"].no_sync()
+        else:
+            sync_context = nullcontext()
+        with sync_context:
+            (loss_total / accum_steps).backward()
+
+        if update_step:
+            if self.grad_clip is not None:
+                torch.nn.utils.clip_grad_norm_(
+                    self.model["KanTtsSAMBERT"].parameters(), self.grad_clip
+                )
+            self.optimizer["KanTtsSAMBERT"].step()
+            self.scheduler["KanTtsSAMBERT"].step()
+            self.optimizer["KanTtsSAMBERT"].zero_grad()
 
         self.total_train_loss["train/TotalLoss"] += loss_total.item()
         self.total_train_loss["train/mel_loss_"] += mel_loss_.item()
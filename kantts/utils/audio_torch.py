@@ -21,14 +21,15 @@ def stft(x, fft_size, hop_size, win_length, window):
     """
     if is_pytorch_17plus:
         x_stft = torch.stft(
-            x, fft_size, hop_size, win_length, window, return_complex=False
+            x, fft_size, hop_size, win_length, window, return_complex=True
         )
+        real, imag = x_stft.real, x_stft.imag
     else:
         x_stft = torch.stft(x, fft_size, hop_size, win_length, window)
-    real = x_stft[..., 0]
-    imag = x_stft[..., 1]
+        real = x_stft[..., 0]
+        imag = x_stft[..., 1]
 
-    return torch.sqrt(torch.clamp(real ** 2 + imag ** 2, min=1e-7)).transpose(2, 1)
+    return torch.sqrt(torch.clamp(real * real + imag * imag, min=1e-7)).transpose(2, 1)
 
 
 def dynamic_range_compression_torch(x, C=1, clip_val=1e-5):
@@ -119,6 +120,15 @@ class MelSpectrogram(torch.nn.Module):
         self.window = window
         self.eps = eps
         self.pad_mode = pad_mode
+        if window is not None:
+            window_func = getattr(torch, f"{window}_window")
+            # persistent=False keeps the deterministic window out of
+            # state_dicts and DDP buffer broadcasts
+            self.register_buffer(
+                "window_tensor", window_func(self.win_length), persistent=False
+            )
+        else:
+            self.window_tensor = None
 
         fmin = 0 if fmin is None else fmin
         fmax = fs / 2 if fmax is None else fmax
@@ -140,7 +150,7 @@ class MelSpectrogram(torch.nn.Module):
             "pad_mode": self.pad_mode,
         }
         if is_pytorch_17plus:
-            self.stft_params["return_complex"] = False
+            self.stft_params["return_complex"] = True
 
         self.log_base = log_base
         if self.log_base is None:
@@ -166,17 +176,21 @@ class MelSpectrogram(torch.nn.Module):
             # (B, C, T) -> (B*C, T)
             x = x.reshape(-1, x.size(2))
 
-        if self.window is not None:
-            window_func = getattr(torch, f"{self.window}_window")
-            window = window_func(self.win_length, dtype=x.dtype, device=x.device)
+        if self.window_tensor is not None:
+            window = self.window_tensor.to(dtype=x.dtype, device=x.device)
         else:
             window = None
 
         x_stft = torch.stft(x, window=window, **self.stft_params)
-        # (B, #freqs, #frames, 2) -> (B, $frames, #freqs, 2)
-        x_stft = x_stft.transpose(1, 2)
-        x_power = x_stft[..., 0] ** 2 + x_stft[..., 1] ** 2
-        x_amp = torch.sqrt(torch.clamp(x_power, min=self.eps))
+        if is_pytorch_17plus:
+            # (B, #freqs, #frames) -> (B, #frames, #freqs)
+            x_stft = x_stft.transpose(1, 2)
+            x_power = x_stft.real * x_stft.real + x_stft.imag * x_stft.imag
+        else:
+            # (B, #freqs, #frames, 2) -> (B, $frames, #freqs, 2)
+            x_stft = x_stft.transpose(1, 2)
+            x_power = x_stft[..., 0] ** 2 + x_stft[..., 1] ** 2
+        x_amp = torch.clamp(x_power, min=self.eps).sqrt_()
 
         x_mel = torch.matmul(x_amp, self.melmat)
         x_mel = torch.clamp(x_mel, min=self.eps)